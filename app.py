@@ -1,40 +1,67 @@
 # Core Flask imports
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Request, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException, NotFound, RequestEntityTooLarge
 
 # AI and API imports
 import google.generativeai as genai
 from elevenlabs import generate, set_api_key, voices
+import elevenlabs.api.base as elevenlabs_api
+import requests
+from requests.adapters import HTTPAdapter
 
 # Standard library imports
 import os
+import io
+import re
 import json
-import tempfile
-from datetime import datetime
+import hashlib
+import math
+import functools
 from pathlib import Path
 import time
 import concurrent.futures
 import threading
 
+# Caching
+from cachetools import TTLCache
+
 # Environment variables
 from dotenv import load_dotenv
 
 # Optional imports for audio processing (may not work on Vercel)
 try:
-    import whisper
+    # decode_audio uses PyAV's bundled FFmpeg libraries in-process (no ffmpeg binary)
+    from faster_whisper import WhisperModel, decode_audio as av_decode_audio
     WHISPER_AVAILABLE = True
 except ImportError:
     print("⚠️ Whisper not available - running without speech recognition")
-    whisper = None
+    WhisperModel = av_decode_audio = None
     WHISPER_AVAILABLE = False
 
 try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    print("⚠️ Soundfile not available - running without audio processing")
+    sf = None
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    from scipy.signal import firwin, resample_poly
+    SCIPY_AVAILABLE = True
 except ImportError:
-    print("⚠️ Pydub not available - running without audio processing")
-    AudioSegment = None
-    PYDUB_AVAILABLE = False
+    print("⚠️ Scipy not available - running without resampling")
+    firwin = resample_poly = None
+    SCIPY_AVAILABLE = False
+
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    print("⚠️ Webrtcvad not available - running without silence trimming")
+    webrtcvad = None
+    WEBRTCVAD_AVAILABLE = False
 
 # Optional heavy audio processing libraries
 try:
@@ -59,8 +86,19 @@ except ImportError:
     print("⚠️ Numpy not available")
     np = None
 
+class InMemoryRequest(Request):
+    """Keep uploaded files in memory instead of spooling large ones to /tmp"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+
+# Data lives next to app.py (send_from_directory resolves relative paths there too),
+# whatever the working directory
+AUDIO_DIR = os.path.join(app.root_path, 'audio', 'responses')
 # Enhanced CORS for production
 CORS(app, origins=["*"], methods=["GET", "POST", "OPTIONS"], 
      allow_headers=["Content-Type", "Authorization"])
@@ -72,90 +110,290 @@ load_dotenv()
 # Production Configuration
 class Config:
     WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+    WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE', 'int8')  # CTranslate2 int8 on CPU
     ENABLE_PARALLEL_PROCESSING = False  # Disabled for Railway
     MAX_WORKERS = 1  # Single worker for Railway
     OPTIMIZE_AUDIO = True
     TARGET_SAMPLE_RATE = 16000
+    VAD_AGGRESSIVENESS = 2  # webrtcvad mode, 0 (least) to 3 (most aggressive)
+    VAD_PADDING_MS = 300  # Speech kept around the first/last voiced frame
     CONFIDENCE_THRESHOLD = 0.7
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB for Railway
+    RESPONSE_CACHE_SIZE = 512
+    RESPONSE_CACHE_TTL = 3600  # Seconds a repeated question reuses its answer + audio
+    TTS_WORKERS = 4  # Background ElevenLabs generations
+    TTS_VOICE = "Callum"
     
     # Production settings
     DEBUG = os.getenv('FLASK_ENV') != 'production'
     SECRET_KEY = os.getenv('SECRET_KEY', 'fallback-secret-key')
 
+# Uploads are held in memory, so bound them
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_FILE_SIZE
+
 # Initialize AI services with error handling
 print("🚀 Initializing Railway production services...")
 
 try:
     print("Loading Whisper model...")
-    whisper_model = whisper.load_model(Config.WHISPER_MODEL)
-    print(f"✅ Whisper model loaded: {Config.WHISPER_MODEL}")
+    whisper_model = WhisperModel(
+        Config.WHISPER_MODEL,
+        device='cpu',
+        compute_type=Config.WHISPER_COMPUTE_TYPE
+    )
+    print(f"✅ Whisper model loaded: {Config.WHISPER_MODEL} ({Config.WHISPER_COMPUTE_TYPE})")
 except Exception as e:
     print(f"❌ Whisper initialization failed: {e}")
     whisper_model = None
 
+# Whisper transcription with Railway-optimized settings; the VAD filter
+# skips silent stretches before they reach the encoder
+WHISPER_OPTIONS = {
+    'language': 'en',
+    'task': 'transcribe',
+    'beam_size': 1,
+    'temperature': 0.0,
+    'condition_on_previous_text': False,
+    'no_speech_threshold': 0.6,
+    'without_timestamps': True,
+    'vad_filter': True
+}
+
+# Pay first-call costs (Silero VAD session, kernel setup, tokenizer) during boot,
+# not on the first user's question. The VAD drops pure silence before the model
+# runs, so a second pass without it exercises the encoder and decoder.
+if whisper_model is not None:
+    try:
+        silence = np.zeros(Config.TARGET_SAMPLE_RATE, dtype=np.float32)
+        for vad_filter in (True, False):
+            segments, _ = whisper_model.transcribe(
+                silence, **{**WHISPER_OPTIONS, 'vad_filter': vad_filter}
+            )
+            list(segments)
+        print("✅ Whisper warmed up")
+    except Exception as e:
+        print(f"⚠️ Whisper warm-up failed: {e}")
+
 try:
     api_key = os.getenv('GEMINI_API_KEY')
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found in environment")
     genai.configure(api_key=api_key)
-    gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+    # Static instructions go in the system prompt; each request only sends the question
+    gemini_model = genai.GenerativeModel(
+        'gemini-1.5-flash',
+        system_instruction=(
+            "Respond helpfully and conversationally in 40-80 words. "
+            "Use plain text only - no formatting. "
+            "Be friendly and knowledgeable."
+        )
+    )
     print("✅ Gemini model initialized")
 except Exception as e:
     print(f"❌ Gemini initialization failed: {e}")
     gemini_model = None
 
+tts_voice = Config.TTS_VOICE  # Name fallback: generate() looks it up per call
+
 try:
     elevenlabs_key = os.getenv('ELEVENLABS_API_KEY')
     if not elevenlabs_key:
         raise ValueError("ELEVENLABS_API_KEY not found in environment")
     set_api_key(elevenlabs_key)
+    
+    # The SDK calls requests.get/post directly; route them through one keep-alive session
+    elevenlabs_session = requests.Session()
+    elevenlabs_session.mount('https://', HTTPAdapter(pool_maxsize=Config.TTS_WORKERS))
+    elevenlabs_api.requests = elevenlabs_session
+    
+    # Resolve the voice once instead of listing voices on every generation
+    try:
+        tts_voice = next(v for v in voices() if v.name == Config.TTS_VOICE)
+    except Exception as e:
+        print(f"⚠️ Could not resolve voice {Config.TTS_VOICE}, looking it up per request: {e}")
     print("✅ ElevenLabs voice initialized")
 except Exception as e:
     print(f"❌ ElevenLabs initialization failed: {e}")
 
+# In-process cache of Gemini responses, keyed by normalized question. Speech is keyed
+# by a hash of the answer text, so audio/responses/<audio_key>.mp3 always matches it
+response_cache = TTLCache(maxsize=Config.RESPONSE_CACHE_SIZE, ttl=Config.RESPONSE_CACHE_TTL)
+speech_texts = TTLCache(maxsize=Config.RESPONSE_CACHE_SIZE, ttl=Config.RESPONSE_CACHE_TTL)
+response_cache_lock = threading.Lock()
+
+# Speech generation runs in the background so the answer JSON returns immediately
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=Config.TTS_WORKERS)
+speech_jobs = {}
+speech_jobs_lock = threading.Lock()
+
+class SpeechJob:
+    """One ElevenLabs generation, saved to disk and relayed to any listeners"""
+    
+    def __init__(self, audio_key, text):
+        self.audio_key = audio_key
+        self.text = text
+        self.audio_path = os.path.join(AUDIO_DIR, f"{audio_key}.mp3")
+        self.chunks = []
+        self.done = False
+        self.condition = threading.Condition()
+    
+    def run(self):
+        partial_path = f"{self.audio_path}.{os.getpid()}.part"
+        try:
+            audio_stream = generate(
+                text=self.text,
+                voice=tts_voice,
+                model="eleven_monolingual_v1",
+                stream=True
+            )
+            with open(partial_path, 'wb') as f:
+                for chunk in audio_stream:
+                    f.write(chunk)
+                    with self.condition:
+                        self.chunks.append(chunk)
+                        self.condition.notify_all()
+            os.replace(partial_path, self.audio_path)
+        except Exception as e:
+            print(f"❌ TTS error: {e}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        finally:
+            with self.condition:
+                self.done = True
+                self.condition.notify_all()
+            with speech_jobs_lock:
+                speech_jobs.pop(self.audio_key, None)
+    
+    def iter_chunks(self):
+        """Yield audio chunks as they arrive, from the beginning"""
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.chunks) and not self.done:
+                    self.condition.wait()
+                pending = self.chunks[index:]
+                finished = self.done
+            index += len(pending)
+            yield from pending
+            if finished and not pending:
+                return
+
+def start_speech_job(audio_key, text):
+    """Return the running generation for audio_key, starting one if needed"""
+    with speech_jobs_lock:
+        job = speech_jobs.get(audio_key)
+        if job is None:
+            job = SpeechJob(audio_key, text)
+            speech_jobs[audio_key] = job
+            executor.submit(job.run)
+    return job
+
 # Create directories with error handling
-directories = ['audio/responses', 'podcasts/uploads', 'podcasts/transcripts']
+directories = [
+    AUDIO_DIR,
+    os.path.join(app.root_path, 'podcasts', 'uploads'),
+    os.path.join(app.root_path, 'podcasts', 'transcripts')
+]
+
+@functools.lru_cache(maxsize=None)
+def ensure_directories():
+    """Create data directories once per process; existing writable ones cost one access() call"""
+    for directory in directories:
+        if os.access(directory, os.W_OK):
+            continue
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"⚠️ Could not create directory {directory}: {e}")
 
-for directory in directories:
-    try:
-        os.makedirs(directory, exist_ok=True)
-    except Exception as e:
-        print(f"⚠️ Could not create directory {directory}: {e}")
+ensure_directories()
+
+# Leading wake word ("hey pod", "hey pot", "pod") and Markdown formatting characters
+WAKE_RE = re.compile(r'^[\s.,!?]*\b(?:hey[\s.,!?]*po[dt]|pod)\b[\s.,!?]*', re.IGNORECASE)
+FMT_RE = re.compile(r'[*_#`]')
 
-def optimize_audio_simple(audio_path):
-    """Simple audio optimization for Railway"""
+def decode_audio(audio_bytes):
+    """Decode uploaded audio bytes in memory to mono float32 samples"""
+    # WAV/FLAC: read at the native rate with libsndfile
+    if SOUNDFILE_AVAILABLE and audio_bytes[:4] in (b'RIFF', b'fLaC'):
+        data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype='float32', always_2d=True)
+        return data.mean(axis=1), sample_rate
+    
+    # Browser recordings (WebM/Opus) and other containers: PyAV, already at 16 kHz mono
+    audio = av_decode_audio(io.BytesIO(audio_bytes), sampling_rate=Config.TARGET_SAMPLE_RATE)
+    return audio, Config.TARGET_SAMPLE_RATE
+
+@functools.lru_cache(maxsize=8)
+def resample_filter(up, down):
+    """Anti-aliasing FIR for resample_poly (scipy's default design, built once per ratio)"""
+    max_rate = max(up, down)
+    return firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+
+def resample_to_target(data, sample_rate):
+    """Polyphase resample to Config.TARGET_SAMPLE_RATE"""
+    divisor = math.gcd(Config.TARGET_SAMPLE_RATE, sample_rate)
+    up = Config.TARGET_SAMPLE_RATE // divisor
+    down = sample_rate // divisor
+    return resample_poly(data, up, down, window=resample_filter(up, down))
+
+if SCIPY_AVAILABLE:
+    # Browser captures are usually 48 kHz -> 3:1 decimation
+    resample_filter(1, 3)
+
+def optimize_audio_simple(data, sample_rate):
+    """Simple audio optimization for Railway (NumPy, returns 16 kHz float32 samples)"""
     try:
         print("🔧 Applying Railway-optimized audio processing...")
-        audio = AudioSegment.from_file(audio_path)
-        
-        # Convert to mono
-        if audio.channels > 1:
-            audio = audio.set_channels(1)
         
         # Normalize volume
-        audio = audio.normalize()
+        peak = np.abs(data).max() if data.size else 0.0
+        if peak > 0:
+            data = data / peak
         
-        # Apply compression for speech clarity
-        audio = audio.compress_dynamic_range(threshold=-20.0, ratio=3.0)
-        
-        # Resample to target rate
-        if audio.frame_rate != Config.TARGET_SAMPLE_RATE:
-            audio = audio.set_frame_rate(Config.TARGET_SAMPLE_RATE)
-        
-        # Export optimized version
-        optimized_path = audio_path.replace('.', '_opt.')
-        if not optimized_path.endswith('.wav'):
-            optimized_path = optimized_path.rsplit('.', 1)[0] + '.wav'
-        
-        audio.export(optimized_path, format="wav")
-        return optimized_path
+        # Apply compression for speech clarity (-20 dB threshold, 3:1 ratio)
+        threshold = 10 ** (-20.0 / 20)
+        ratio = 3.0
+        magnitude = np.abs(data)
+        loud = magnitude > threshold
+        gain = np.ones_like(data)
+        gain[loud] = ((magnitude[loud] - threshold) / ratio + threshold) / magnitude[loud]
+        data = data * gain
         
     except Exception as e:
         print(f"⚠️ Audio optimization failed: {e}")
-        return audio_path
+    
+    # Resample to target rate (Whisper expects 16 kHz)
+    if sample_rate != Config.TARGET_SAMPLE_RATE:
+        data = resample_to_target(data, sample_rate)
+    
+    return data.astype(np.float32, copy=False)
 
-def transcribe_question_simple(audio_path):
+def trim_silence(audio):
+    """Cut leading/trailing non-speech from 16 kHz samples using 30 ms VAD frames"""
+    if not WEBRTCVAD_AVAILABLE:
+        return audio
+    
+    frame_size = Config.TARGET_SAMPLE_RATE * 30 // 1000
+    frame_count = len(audio) // frame_size
+    pcm = (np.clip(audio[:frame_count * frame_size], -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    vad = webrtcvad.Vad(Config.VAD_AGGRESSIVENESS)
+    
+    # One forward pass - the VAD keeps state between frames
+    frame_bytes = frame_size * 2
+    voiced = [
+        i for i in range(frame_count)
+        if vad.is_speech(pcm[i * frame_bytes:(i + 1) * frame_bytes], Config.TARGET_SAMPLE_RATE)
+    ]
+    if not voiced:
+        return audio[:0]
+    first, last = voiced[0], voiced[-1]
+    
+    padding = Config.TARGET_SAMPLE_RATE * Config.VAD_PADDING_MS // 1000
+    start = max(first * frame_size - padding, 0)
+    end = min((last + 1) * frame_size + padding, len(audio))
+    return audio[start:end]
+
+def transcribe_question_simple(audio_bytes):
     """Simplified transcription for Railway"""
     if not whisper_model:
         raise Exception("Whisper model not available")
@@ -163,29 +401,18 @@ def transcribe_question_simple(audio_path):
     try:
         print("🎤 Processing question with Railway optimization...")
         
-        # Apply simple audio processing
-        enhanced_path = optimize_audio_simple(audio_path)
+        # Decode once in memory and apply simple audio processing
+        data, sample_rate = decode_audio(audio_bytes)
+        audio = optimize_audio_simple(data, sample_rate)
         
-        # Whisper transcription with Railway-optimized settings
-        result = whisper_model.transcribe(
-            enhanced_path,
-            fp16=False,
-            language='en',
-            task='transcribe',
-            verbose=False,
-            temperature=0.0,
-            condition_on_previous_text=False,
-            initial_prompt="This is a clear question about a podcast."
-        )
+        # Button-hold recordings carry silence at both ends; don't encode it
+        audio = trim_silence(audio)
+        if not audio.size:
+            return "", 0.0
         
-        # Cleanup enhanced file
-        if enhanced_path != audio_path:
-            try:
-                os.remove(enhanced_path)
-            except:
-                pass
+        segments, _ = whisper_model.transcribe(audio, **WHISPER_OPTIONS)
         
-        transcript = result['text'].strip()
+        transcript = ' '.join(segment.text.strip() for segment in segments).strip()
         confidence = 0.8  # Default confidence for Railway
         
         return transcript, confidence
@@ -302,10 +529,30 @@ FRONTEND_HTML = """
                 this.isRecording = false;
                 this.mediaRecorder = null;
                 this.recordedChunks = [];
+                this.upload = null;
+                this.streamUploads = SimplePodcastAI.supportsRequestStreams();
                 
                 this.initializeApp();
             }
 
+            static supportsRequestStreams() {
+                // Streaming request bodies (Chromium, HTTP/2); other browsers send one upload on release
+                let duplexAccessed = false;
+                try {
+                    const hasContentType = new Request('', {
+                        body: new ReadableStream(),
+                        method: 'POST',
+                        get duplex() {
+                            duplexAccessed = true;
+                            return 'half';
+                        }
+                    }).headers.has('Content-Type');
+                    return duplexAccessed && !hasContentType;
+                } catch (error) {
+                    return false;
+                }
+            }
+
             async initializeApp() {
                 await this.checkBackendStatus();
                 this.setupRecording();
@@ -352,20 +599,27 @@ FRONTEND_HTML = """
                         } 
                     });
 
-                    this.mediaRecorder = new MediaRecorder(stream);
+                    const mimeType = MediaRecorder.isTypeSupported('audio/webm;codecs=opus') ? 'audio/webm;codecs=opus' : '';
+                    this.mediaRecorder = new MediaRecorder(stream, mimeType ? { mimeType } : {});
                     this.recordedChunks = [];
+                    this.upload = this.streamUploads
+                        ? this.startStreamingUpload(this.mediaRecorder.mimeType || 'audio/webm')
+                        : null;
                     
                     this.mediaRecorder.ondataavailable = (event) => {
                         if (event.data.size > 0) {
                             this.recordedChunks.push(event.data);
+                            if (this.upload) this.upload.write(event.data);
                         }
                     };
 
                     this.mediaRecorder.onstop = () => {
+                        if (this.upload) this.upload.close();
                         this.processRecording();
                     };
 
-                    this.mediaRecorder.start();
+                    // Emit chunks every 250 ms so the upload runs while the user is still speaking
+                    this.mediaRecorder.start(250);
                     this.isRecording = true;
 
                     const recordButton = document.getElementById('recordButton');
@@ -389,17 +643,64 @@ FRONTEND_HTML = """
                 recordButton.classList.remove('recording');
             }
 
+            startStreamingUpload(mimeType) {
+                // Recorded chunks are piped into the request body; it closes when recording stops
+                const { readable, writable } = new TransformStream();
+                const writer = writable.getWriter();
+                let pending = Promise.resolve();
+
+                const response = fetch(`${this.API_BASE}/ask-question`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': mimeType },
+                    body: readable,
+                    duplex: 'half'
+                });
+                response.catch(() => {});
+
+                return {
+                    response,
+                    write: (blob) => {
+                        pending = pending
+                            .then(async () => writer.write(new Uint8Array(await blob.arrayBuffer())))
+                            .catch(() => {});
+                    },
+                    close: () => {
+                        pending = pending.then(() => writer.close()).catch(() => {});
+                    }
+                };
+            }
+
             async processRecording() {
                 try {
-                    const audioBlob = new Blob(this.recordedChunks, { type: 'audio/wav' });
-                    const formData = new FormData();
-                    formData.append('audio', audioBlob, 'question.wav');
-                    formData.append('timestamp', 0);
+                    let response = null;
+                    if (this.upload) {
+                        try {
+                            response = await this.upload.response;
+                        } catch (error) {
+                            // e.g. no HTTP/2 to the server - resend the recorded chunks as one upload
+                            this.streamUploads = false;
+                        }
+                        this.upload = null;
+                    }
 
-                    const response = await fetch(`${this.API_BASE}/ask-question`, {
-                        method: 'POST',
-                        body: formData
-                    });
+                    if (!response) {
+                        const audioBlob = new Blob(this.recordedChunks, { type: 'audio/wav' });
+                        const formData = new FormData();
+                        formData.append('audio', audioBlob, 'question.wav');
+                        formData.append('timestamp', 0);
+
+                        response = await fetch(`${this.API_BASE}/ask-question`, {
+                            method: 'POST',
+                            body: formData
+                        });
+                    }
+
+                    // Fresh answers stream as Server-Sent Events; errors and cached answers are JSON
+                    const contentType = response.headers.get('Content-Type') || '';
+                    if (contentType.includes('text/event-stream')) {
+                        await this.readAnswerStream(response);
+                        return;
+                    }
 
                     const data = await response.json();
                     
@@ -418,20 +719,81 @@ FRONTEND_HTML = """
                 }
             }
 
-            displayResponse(data) {
+            async readAnswerStream(response) {
+                const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                let qaItem = null;
+                let finished = false;
+
+                try {
+                    while (true) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += value;
+
+                        let boundary;
+                        while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                            const message = buffer.slice(0, boundary);
+                            buffer = buffer.slice(boundary + 2);
+
+                            let event = 'message';
+                            let data = '';
+                            for (const line of message.split('\\n')) {
+                                if (line.startsWith('event: ')) event = line.slice(7);
+                                else if (line.startsWith('data: ')) data += line.slice(6);
+                            }
+                            const payload = JSON.parse(data);
+
+                            if (event === 'question') {
+                                qaItem = this.createQaItem(payload.question);
+                                document.getElementById('status').textContent = '🤖 Answering...';
+                            } else if (event === 'delta') {
+                                qaItem.querySelector('.answer').textContent += payload.delta;
+                            } else if (event === 'done') {
+                                this.finishQaItem(qaItem, payload);
+                                finished = true;
+                            } else if (event === 'error') {
+                                throw new Error(payload.error);
+                            }
+                        }
+                    }
+
+                    // e.g. worker timeout or restart cut the response before the final event
+                    if (!finished) {
+                        throw new Error('Answer stream ended unexpectedly');
+                    }
+                } catch (error) {
+                    // Don't leave a half-written answer in the list as if it were complete
+                    if (qaItem && !finished) qaItem.remove();
+                    throw error;
+                }
+            }
+
+            createQaItem(question) {
                 const container = document.getElementById('responseContainer');
                 const qaItem = document.createElement('div');
                 qaItem.className = 'qa-item';
                 qaItem.innerHTML = `
-                    <div class="question">Q: ${data.question}</div>
-                    <div class="answer">A: ${data.response}</div>
-                    ${data.audio_url ? `<audio controls><source src="${data.audio_url}" type="audio/mpeg"></audio>` : ''}
+                    <div class="question">Q: ${question}</div>
+                    <div class="answer">A: </div>
                 `;
                 container.insertBefore(qaItem, container.firstChild);
+                return qaItem;
+            }
+
+            finishQaItem(qaItem, data) {
+                qaItem.querySelector('.answer').textContent = `A: ${data.response}`;
+                if (data.audio_url) {
+                    qaItem.insertAdjacentHTML('beforeend', `<audio controls><source src="${data.audio_url}" type="audio/mpeg"></audio>`);
+                }
                 
                 document.getElementById('status').textContent = '✅ Response generated! Ask another question.';
                 document.getElementById('status').className = 'status ready';
             }
+
+            displayResponse(data) {
+                this.finishQaItem(this.createQaItem(data.question), data);
+            }
         }
 
         document.addEventListener('DOMContentLoaded', () => {
@@ -442,10 +804,20 @@ FRONTEND_HTML = """
 </html>
 """
 
+# The page has no template variables, so encode it once and let browsers revalidate by ETag
+FRONTEND_BYTES = FRONTEND_HTML.encode('utf-8')
+FRONTEND_ETAG = hashlib.md5(FRONTEND_BYTES).hexdigest()
+
 @app.route('/')
 def index():
     """Serve the frontend"""
-    return render_template_string(FRONTEND_HTML)
+    response = Response(
+        FRONTEND_BYTES,
+        mimetype='text/html',
+        headers={'Cache-Control': 'public, max-age=3600'}
+    )
+    response.set_etag(FRONTEND_ETAG)
+    return response.make_conditional(request)
 
 @app.route('/health')
 def health_check():
@@ -458,6 +830,10 @@ def health_check():
         "deployment": "railway"
     })
 
+def sse_event(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
 @app.route('/ask-question', methods=['POST', 'OPTIONS'])
 def ask_question():
     """Handle questions with Railway optimization"""
@@ -471,90 +847,155 @@ def ask_question():
         if not gemini_model:
             return jsonify({'error': 'AI response unavailable'}), 503
             
-        # Get audio file
-        if 'audio' not in request.files:
+        # Get audio: a multipart upload, or a raw audio/* body streamed while recording
+        if 'audio' in request.files:
+            audio_bytes = request.files['audio'].read()
+        elif request.mimetype.startswith('audio/'):
+            audio_bytes = request.get_data(cache=False)
+            # Chunked bodies have no Content-Length; Werkzeug stops reading at the limit
+            # without raising, so a body that fills it is treated as too large
+            if request.content_length is None and len(audio_bytes) >= app.config['MAX_CONTENT_LENGTH']:
+                raise RequestEntityTooLarge()
+        else:
             return jsonify({'error': 'No audio file provided'}), 400
-            
-        audio_file = request.files['audio']
         
-        # Save audio temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            temp_path = tmp_file.name
+        if not audio_bytes:
+            return jsonify({'error': 'No audio file provided'}), 400
         
         print("🎤 Processing question on Railway...")
         
         # Transcribe question
         try:
-            question, confidence = transcribe_question_simple(temp_path)
+            question, confidence = transcribe_question_simple(audio_bytes)
             
             # Clean up wake words
-            wake_patterns = ['hey pod', 'hey pot', 'pod']
-            for pattern in wake_patterns:
-                question = question.replace(pattern, '').strip()
-            question = question.lstrip('.,!? ').strip()
+            question = WAKE_RE.sub('', question).strip()
             
         except Exception as e:
-            os.unlink(temp_path)
             return jsonify({'error': f'Could not understand audio: {str(e)}'}), 400
         
-        # Clean up temp file
-        os.unlink(temp_path)
-        
         if not question or len(question.strip()) < 3:
             return jsonify({'error': 'Question too short. Please speak clearly.'}), 400
         
         print(f"🗣️ Railway question: {question}")
         
-        # Generate AI response
-        try:
-            prompt = f"""
-            A user asked this question: {question}
-            
-            Respond helpfully and conversationally in 40-80 words. 
-            Use plain text only - no formatting.
-            Be friendly and knowledgeable.
-            """
-            
-            response = gemini_model.generate_content(prompt)
-            ai_response = response.text.strip()
-            
-            # Clean formatting
-            for char in ['*', '_', '#', '`', '**', '__']:
-                ai_response = ai_response.replace(char, '')
-            
-        except Exception as e:
-            return jsonify({'error': f'AI response failed: {str(e)}'}), 500
+        # Repeat questions skip Gemini and ElevenLabs entirely
+        cache_key = hashlib.md5(question.lower().strip().encode()).hexdigest()
+        with response_cache_lock:
+            cached = response_cache.get(cache_key)
+        if cached:
+            print(f"⚡ Cache hit for question: {cache_key}")
+            return jsonify({
+                'question': question,
+                'response': cached['response'],
+                'audio_url': cached['audio_url'],
+                'confidence': confidence,
+                'deployment': 'railway'
+            })
         
-        # Generate audio response
-        audio_url = None
-        try:
-            audio = generate(
-                text=ai_response,
-                voice="Callum",
-                model="eleven_monolingual_v1"
-            )
+        # Generate AI response, streaming text to the client as Gemini produces it
+        def answer_stream():
+            yield sse_event('question', {'question': question, 'confidence': confidence})
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            audio_filename = f"response_{timestamp}.mp3"
-            audio_path = f"audio/responses/{audio_filename}"
-            
-            with open(audio_path, 'wb') as f:
-                f.write(audio)
+            parts = []
+            try:
+                for chunk in gemini_model.generate_content(question, stream=True):
+                    # Clean formatting
+                    delta = FMT_RE.sub('', chunk.text)
+                    parts.append(delta)
+                    yield sse_event('delta', {'delta': delta})
+            except Exception as e:
+                yield sse_event('error', {'error': f'AI response failed: {str(e)}'})
+                return
+            ai_response = ''.join(parts).strip()
             
-            audio_url = f'/audio/{audio_filename}'
+            # Start speech in the background; the client streams it from audio_url
+            audio_key = hashlib.md5(ai_response.encode()).hexdigest()
+            audio_url = f'/audio/stream/{audio_key}'
+            with response_cache_lock:
+                response_cache[cache_key] = {'response': ai_response, 'audio_url': audio_url}
+                speech_texts[audio_key] = ai_response
+            start_speech_job(audio_key, ai_response)
             
-        except Exception as e:
-            print(f"❌ TTS error: {e}")
+            yield sse_event('done', {
+                'question': question,
+                'response': ai_response,
+                'audio_url': audio_url,
+                'confidence': confidence,
+                'deployment': 'railway'
+            })
         
-        return jsonify({
-            'question': question,
-            'response': ai_response,
-            'audio_url': audio_url,
-            'confidence': confidence,
-            'deployment': 'railway'
-        })
+        return Response(
+            answer_stream(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
         
+    except HTTPException:
+        # e.g. 413 raised while Werkzeug parses the upload - let the error handlers answer
+        raise
     except Exception as e:
         print(f"❌ Railway error: {e}")
-        return js
\ No newline at end of file
+        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+@app.route('/audio/<filename>')
+def serve_audio(filename):
+    """Serve audio files (cacheable, conditional and range requests)"""
+    try:
+        # Files are named by a hash of the spoken text, so their content never changes
+        return send_from_directory(
+            AUDIO_DIR, filename,
+            max_age=86400, conditional=True, etag=True
+        )
+    except NotFound:
+        return jsonify({'error': 'Audio file not found'}), 404
+
+@app.route('/audio/stream/<audio_key>')
+def stream_audio(audio_key):
+    """Stream response speech while it is being generated"""
+    if not re.fullmatch(r'[0-9a-f]{32}', audio_key):
+        return jsonify({'error': 'Audio file not found'}), 404
+    
+    with speech_jobs_lock:
+        job = speech_jobs.get(audio_key)
+    
+    if job is None:
+        if os.path.exists(os.path.join(AUDIO_DIR, f"{audio_key}.mp3")):
+            return serve_audio(f"{audio_key}.mp3")
+        
+        # Finished or failed earlier - regenerate from the cached answer
+        with response_cache_lock:
+            text = speech_texts.get(audio_key)
+        if not text:
+            return jsonify({'error': 'Audio file not found'}), 404
+        job = start_speech_job(audio_key, text)
+    
+    chunks = job.iter_chunks()
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return jsonify({'error': 'Audio generation failed'}), 502
+    
+    def relay():
+        yield first_chunk
+        yield from chunks
+    
+    return Response(relay(), mimetype='audio/mpeg')
+
+@app.errorhandler(413)
+def request_entity_too_large(error):
+    return jsonify({'error': 'File too large'}), 413
+
+@app.errorhandler(500)
+def internal_server_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
+
+if __name__ == '__main__':
+    try:
+        port = int(os.environ.get('PORT', 5001))
+        print("✅ Railway production backend ready!")
+        print(f"👉 Running on port {port}")
+        app.run(host='0.0.0.0', port=port, debug=Config.DEBUG)
+    except Exception as e:
+        print(f"❌ Failed to start server: {e}")
+        import traceback
+        traceback.print_exc()
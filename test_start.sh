@@ -3,4 +3,7 @@ echo "=== Environment Variables ==="
 env | grep -E "PORT|RAILWAY"
 echo "=== PORT value: $PORT ==="
 echo "=== Starting Gunicorn ==="
-exec gunicorn app:app --bind 0.0.0.0:${PORT:-8000} --timeout 120 --workers 1
+# gthread worker: one process (one Whisper model in memory), several threads so
+# /health, /audio and new uploads are served while Gemini/ElevenLabs calls wait on I/O
+exec gunicorn app:app --bind 0.0.0.0:${PORT:-8000} --timeout 120 --workers 1 \
+    --worker-class gthread --threads ${WEB_THREADS:-8}